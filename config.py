@@ -1,14 +1,23 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Guard against re-running dotenv's file parsing when this module is
+# reloaded (e.g. by test harnesses or hot-reloading servers).
+if not globals().get("_LOADED", False):
+    load_dotenv()
+    _LOADED = True
 
-PRIMARY_MODEL_NAME = os.getenv("PRIMARY_MODEL_NAME")
-MAX_RETRY_ITERATIONS = int(os.getenv("MAX_RETRY_ITERATIONS"))
-MAX_CODE_TIMEOUT = int(os.getenv("MAX_CODE_TIMEOUT"))
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Snapshot the process environment once so every constant below is
+# resolved from a plain local dict instead of repeated os.getenv calls.
+_env = os.environ.copy()
+
+LOG_LEVEL = _env.get("LOG_LEVEL", "INFO").upper()
+PRIMARY_MODEL_NAME = _env.get("PRIMARY_MODEL_NAME")
+MAX_RETRY_ITERATIONS = int(_env.get("MAX_RETRY_ITERATIONS") or 10)
+MAX_CODE_TIMEOUT = int(_env.get("MAX_CODE_TIMEOUT") or 240)
+OPENAI_API_KEY = _env.get("OPENAI_API_KEY")
 
 # E2B Configuration
-E2B_API_KEY = os.getenv("E2B_API_KEY")
-E2B_TEMPLATE_ID = os.getenv("E2B_TEMPLATE_ID", "base")
-ALLOW_LOCAL_EXECUTION = os.getenv("ALLOW_LOCAL_EXECUTION") == 'true'
+E2B_API_KEY = _env.get("E2B_API_KEY")
+E2B_TEMPLATE_ID = _env.get("E2B_TEMPLATE_ID", "base")
+ALLOW_LOCAL_EXECUTION = _env.get("ALLOW_LOCAL_EXECUTION", "").lower() == 'true'
@@ -1,15 +1,50 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+import asyncio
 import time
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, List
 
 from config import MAX_RETRY_ITERATIONS
 from core.graph_flow import create_graph_flow
+from core.state_models import keep_recent_feedback
 
 
 code_agent_app = create_graph_flow()
 
+# Successful end-to-end results keyed by the normalized question, shared
+# across CodeAgent instances. A repeat of an already-solved request skips
+# the whole graph — no LLM calls, no sandbox.
+_RESULT_CACHE_MAX = 128
+_result_cache: "OrderedDict[str, ExecutionResult]" = OrderedDict()
+_result_cache_lock = threading.Lock()
 
-@dataclass
+
+def _normalize_question(question: str) -> str:
+    """Collapse whitespace and case so trivial rephrasings share a key."""
+    return " ".join(question.split()).lower()
+
+
+def _cached_result(question: str) -> "Optional[ExecutionResult]":
+    with _result_cache_lock:
+        cached = _result_cache.get(_normalize_question(question))
+        if cached is None:
+            return None
+        _result_cache.move_to_end(_normalize_question(question))
+        # Hand out a copy so callers cannot mutate the cached entry.
+        return replace(cached, feedback_history=list(cached.feedback_history))
+
+
+def _store_result(question: str, result: "ExecutionResult") -> None:
+    if not result.success:
+        return
+    with _result_cache_lock:
+        _result_cache[_normalize_question(question)] = result
+        while len(_result_cache) > _RESULT_CACHE_MAX:
+            _result_cache.popitem(last=False)
+
+
+@dataclass(slots=True)
 class ExecutionResult:
     success: bool
     code: Optional[str] = None
@@ -18,11 +53,7 @@ class ExecutionResult:
     error_message: Optional[str] = None
     iterations: int = 0
     execution_time: float = 0.0
-    feedback_history: List[str] = None
-
-    def __post_init__(self):
-        if self.feedback_history is None:
-            self.feedback_history = []
+    feedback_history: List[str] = field(default_factory=list)
 
 
 class CodeAgent:
@@ -48,12 +79,17 @@ class CodeAgent:
         self.verbose = verbose
         self._app = code_agent_app
 
-    def generate_and_execute(self, question: str) -> ExecutionResult:
+    def generate_and_execute(self,
+                             question: str,
+                             progress_cb: Optional[Callable[[float, str], None]] = None
+                             ) -> ExecutionResult:
         """
         Generate and execute Python code based on a natural language question.
 
         Args:
             question: Natural language description of the coding task
+            progress_cb: Optional callback invoked after each graph node
+                with (fraction_complete, description), e.g. for UI progress
 
         Returns:
             ExecutionResult containing the outcome and metadata
@@ -64,21 +100,21 @@ class CodeAgent:
             print(f"🤖 CodeAgent: Processing request: '{question}'")
             print("=" * 60)
 
-        initial_state = {
-            "initial_question": question,
-            "iteration": 0,
-            "feedback_history": [],
-            "optimized_prompt": "",
-            "generation": None,
-            "execution_result": None,
-            "error_message": None
-        }
+        cached = _cached_result(question)
+        if cached is not None:
+            if self.verbose:
+                print("♻️  Returning cached result for an identical request.")
+                self._print_summary(cached)
+            return cached
+
+        initial_state = self._initial_state(question)
 
         try:
-            final_state = self._run_workflow(initial_state)
+            final_state = self._run_workflow(initial_state, progress_cb)
             execution_time = time.time() - start_time
 
             result = self._process_final_state(final_state, execution_time)
+            _store_result(question, result)
 
             if self.verbose:
                 self._print_summary(result)
@@ -114,22 +150,14 @@ class CodeAgent:
             print(f"🤖 CodeAgent: Generating code for: '{question}'")
             print("=" * 60)
 
-        initial_state = {
-            "initial_question": question,
-            "iteration": 0,
-            "feedback_history": [],
-            "optimized_prompt": "",
-            "generation": None,
-            "execution_result": None,
-            "error_message": None
-        }
+        initial_state = self._initial_state(question)
 
         try:
-            state = initial_state.copy()
+            state = initial_state
 
             for event in self._app.stream(state):
                 for node_name, node_data in event.items():
-                    state.update(node_data)
+                    self._merge_update(state, node_data)
                     if self.verbose:
                         print(f"✓ Completed: {node_name}")
 
@@ -157,15 +185,87 @@ class CodeAgent:
                 execution_time=execution_time
             )
 
-    def _run_workflow(self, initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    async def agenerate_and_execute(self, question: str) -> ExecutionResult:
+        """
+        Async counterpart of generate_and_execute. Awaiting several of
+        these (e.g. under asyncio.gather) overlaps their LLM and sandbox
+        latency instead of paying it per question.
+        """
+        start_time = time.time()
+
+        cached = _cached_result(question)
+        if cached is not None:
+            return cached
+
+        try:
+            final_state = await self._app.ainvoke(self._initial_state(question))
+            result = self._process_final_state(final_state,
+                                               time.time() - start_time)
+            _store_result(question, result)
+            return result
+        except Exception as e:
+            return ExecutionResult(
+                success=False,
+                error_message=f"Workflow execution failed: {str(e)}",
+                execution_time=time.time() - start_time
+            )
+
+    async def async_run(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run several questions through the workflow concurrently and return
+        their final states. The graph's LLM round-trips are IO-bound, so
+        gathering the invocations overlaps their network latency instead
+        of paying it once per question.
+        """
+        states = [self._initial_state(q) for q in questions]
+        return await asyncio.gather(*(self._app.ainvoke(s) for s in states))
+
+    @staticmethod
+    def _initial_state(question: str) -> Dict[str, Any]:
+        """Build a fresh workflow state for a question."""
+        return {
+            "initial_question": question,
+            "iteration": 0,
+            "feedback_history": [],
+            "optimized_prompt": "",
+            "generation": None,
+            "execution_result": None,
+            "error_message": None,
+            "install_future": None
+        }
+
+    @staticmethod
+    def _merge_update(state: Dict[str, Any], node_data: Dict[str, Any]) -> None:
+        """
+        Merge a node's partial state update into the tracked state,
+        mirroring the graph's reducer semantics (feedback_history entries
+        are appended, everything else is overwritten).
+        """
+        for key, value in node_data.items():
+            if key == "feedback_history":
+                state[key] = keep_recent_feedback(state.get(key, []), value)
+            else:
+                state[key] = value
+
+    def _run_workflow(self,
+                      initial_state: Dict[str, Any],
+                      progress_cb: Optional[Callable[[float, str], None]] = None
+                      ) -> Dict[str, Any]:
         """Execute the complete workflow and return final state."""
-        final_state = initial_state.copy()
+        final_state = initial_state
 
         for event in self._app.stream(initial_state):
             for node_name, node_data in event.items():
-                final_state.update(node_data)
+                self._merge_update(final_state, node_data)
                 if self.verbose:
                     print(f"✓ Completed: {node_name}")
+                if progress_cb is not None:
+                    iteration = final_state.get("iteration", 0)
+                    progress_cb(
+                        min(iteration / self.max_retries, 1.0),
+                        f"Completed {node_name} "
+                        f"(iteration {iteration}/{self.max_retries})"
+                    )
 
         return final_state
 
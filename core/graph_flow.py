@@ -4,6 +4,11 @@ from core.state_models import GraphState
 from langgraph.graph import StateGraph, START, END
 
 
+def _branch_on_error(state: GraphState) -> str:
+    """Route to execution unless code generation reported an error."""
+    return "retry" if state.get("error_message") else "continue"
+
+
 def create_graph_flow() -> StateGraph:
     """
     Create and configure the AI code agent's graph.
@@ -22,7 +27,7 @@ def create_graph_flow() -> StateGraph:
 
     graph_flow.add_conditional_edges(
         "generate_code",
-        lambda x: "retry" if x.get("error_message") else "continue",
+        _branch_on_error,
         {
             "continue": "execute_code",
             "retry": END
@@ -1,13 +1,53 @@
+import atexit
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Type
+import httpx
 from pydantic import BaseModel, ValidationError
-from openai import OpenAI, APIError
+from openai import OpenAI, AsyncOpenAI, APIError
 
 from config import PRIMARY_MODEL_NAME, OPENAI_API_KEY
+from core import llm_cache
 
 
 logger = logging.getLogger(__name__)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+# Shared connection pools for every LLM call in the process: keep-alive
+# connections skip the TCP+TLS handshake on all requests after the first,
+# and concurrent graph invocations draw from one bounded pool.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+_sync_http_client = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+_async_http_client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+atexit.register(_sync_http_client.close)
+
+openai_client = OpenAI(api_key=OPENAI_API_KEY, http_client=_sync_http_client)
+async_openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY,
+                                  http_client=_async_http_client)
+
+
+@lru_cache(maxsize=None)
+def _tool_def(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build the OpenAI tool definition for a Pydantic model once per model
+    class; model_json_schema() walks the whole model and is too expensive
+    to redo on every LLM call.
+    """
+    return {
+        "type": "function",
+        "function": {
+            "name": pydantic_model.__name__,
+            "description": pydantic_model.__doc__ or f"Extracts data using the {pydantic_model.__name__} schema.",
+            "parameters": pydantic_model.model_json_schema()
+        }
+    }
+
+
+@lru_cache(maxsize=None)
+def _tool_choice(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
+    """Cache the tool_choice payload that forces the model to use the tool."""
+    return {"type": "function",
+            "function": {"name": pydantic_model.__name__}}
 
 
 def call_llm_with_tool(
@@ -21,30 +61,93 @@ def call_llm_with_tool(
     (Pydantic model) and an outlet (the LLM), and it handles making the
     connection and ensuring the power (data) flows correctly and safely.
     """
-    try:
-        tool_definition = {
-            "type": "function",
-            "function": {
-                "name": pydantic_model.__name__,
-                "description": pydantic_model.__doc__ or f"Extracts data using the {pydantic_model.__name__} schema.",
-                "parameters": pydantic_model.model_json_schema()
-            }
-        }
+    cache_key = llm_cache.make_key(messages, pydantic_model.__name__)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("LLM cache hit for %s; skipping API call.",
+                     pydantic_model.__name__)
+        # The cached fields already passed validation on the way in, so
+        # rebuild without re-validating; each hit gets a fresh instance.
+        return pydantic_model.model_construct(**cached), None
 
+    try:
         response = openai_client.chat.completions.create(
             model=PRIMARY_MODEL_NAME,
             messages=messages,
-            tools=[tool_definition],
-            tool_choice={"type": "function",
-                         "function": {"name": pydantic_model.__name__}},
+            tools=[_tool_def(pydantic_model)],
+            tool_choice=_tool_choice(pydantic_model),
+            stream=True,
         )
 
-        message = response.choices[0].message
-        if not message.tool_calls:
+        # Accumulate the streamed tool-call argument fragments instead of
+        # blocking until the full completion is assembled server-side.
+        argument_parts: List[str] = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.tool_calls:
+                fragment = delta.tool_calls[0].function.arguments
+                if fragment:
+                    argument_parts.append(fragment)
+
+        if not argument_parts:
+            return None, "The model failed to use the required tool. It might have refused or misunderstood."
+
+        instance = pydantic_model.model_validate_json("".join(argument_parts))
+        llm_cache.set(cache_key, instance.model_dump())
+        return instance, None
+
+    except APIError as e:
+        return None, f"OpenAI API Error: {e}"
+    except ValidationError as e:
+        return None, f"Pydantic Validation Error: The model's output did not match the required schema. Details: {e}"
+    except Exception as e:
+        return None, f"An unexpected error occurred during the LLM call: {e}"
+
+
+async def acall_llm_with_tool(
+    messages: List[Dict[str, Any]],
+    pydantic_model: Type[BaseModel]) -> tuple[Optional[BaseModel],
+                                              Optional[str]]:
+    """
+    Async counterpart of call_llm_with_tool for callers running on an
+    event loop; concurrent graph invocations overlap their LLM
+    round-trips through non-blocking IO instead of serializing them.
+    """
+    cache_key = llm_cache.make_key(messages, pydantic_model.__name__)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("LLM cache hit for %s; skipping API call.",
+                     pydantic_model.__name__)
+        # The cached fields already passed validation on the way in, so
+        # rebuild without re-validating; each hit gets a fresh instance.
+        return pydantic_model.model_construct(**cached), None
+
+    try:
+        response = await async_openai_client.chat.completions.create(
+            model=PRIMARY_MODEL_NAME,
+            messages=messages,
+            tools=[_tool_def(pydantic_model)],
+            tool_choice=_tool_choice(pydantic_model),
+            stream=True,
+        )
+
+        argument_parts: List[str] = []
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.tool_calls:
+                fragment = delta.tool_calls[0].function.arguments
+                if fragment:
+                    argument_parts.append(fragment)
+
+        if not argument_parts:
             return None, "The model failed to use the required tool. It might have refused or misunderstood."
 
-        tool_args = message.tool_calls[0].function.arguments
-        instance = pydantic_model.model_validate_json(tool_args)
+        instance = pydantic_model.model_validate_json("".join(argument_parts))
+        llm_cache.set(cache_key, instance.model_dump())
         return instance, None
 
     except APIError as e:
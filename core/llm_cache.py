@@ -0,0 +1,51 @@
+"""
+Small in-memory LRU cache for structured LLM responses.
+
+Requests are content-addressed by their messages and target schema, so a
+byte-identical prompt (e.g. one of the canned UI examples clicked twice)
+skips the whole LLM round-trip. Retries inside a workflow never collide:
+their prompts embed the growing feedback history.
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+_MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def make_key(messages: list, schema_name: str) -> str:
+    """Content-address a chat request: same messages and schema, same key."""
+    digest = hashlib.sha256(
+        json.dumps(messages, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return f"{schema_name}:{digest}"
+
+
+def get(key: str) -> Optional[Any]:
+    """Return the cached value for a key, or None on miss."""
+    with _lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+        return value
+
+
+def set(key: str, value: Any) -> None:
+    """Store a value, evicting the least recently used entries beyond the cap."""
+    with _lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear() -> None:
+    """Drop every cached entry."""
+    with _lock:
+        _cache.clear()
@@ -1,12 +1,24 @@
+import io
 import re
+import sys
+import json
 import time
+import random
+import atexit
+import queue
+import hashlib
 import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from typing import Optional
 
 from e2b_code_interpreter import Sandbox
 
 from config import (MAX_CODE_TIMEOUT,
                     MAX_RETRY_ITERATIONS,
-                    E2B_API_KEY)
+                    E2B_API_KEY,
+                    ALLOW_LOCAL_EXECUTION)
 from core.interaction import call_llm_with_tool
 from core.state_models import GraphState, CodeSolution, PythonCode
 from core.prompts import (PROMPT_OPTIMIZATION_SYSTEM_PROMPT,
@@ -16,6 +28,291 @@ from core.prompts import (PROMPT_OPTIMIZATION_SYSTEM_PROMPT,
 
 logger = logging.getLogger(__name__)
 
+# The graph-facing surface; everything else in this module is plumbing.
+__all__ = ["optimize_prompt", "generate_code", "execute_code", "should_continue"]
+
+_IMPORT_RE = re.compile(r'^\s*(?:import|from)\s+([\w\d_]+)', re.MULTILINE)
+_LINE_NO_RE = re.compile(r'line \d+')
+
+# Import names whose PyPI distribution is published under a different name.
+_PACKAGE_ALIASES = {
+    "cv2": "opencv-python",
+    "sklearn": "scikit-learn",
+    "PIL": "Pillow",
+    "bs4": "beautifulsoup4",
+    "yaml": "PyYAML",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+}
+
+# Keep at most this much of a local run's stdout/stderr tail. Generated
+# scripts can print megabytes before crashing; everything past the cap
+# would only bloat the retry prompt without adding diagnostic value.
+_LOCAL_OUTPUT_CAP = 1_000_000
+
+# Retry-prompt budget: how many recent feedback entries are replayed to
+# the LLM, and the tail kept of each (tracebacks end with the part that
+# matters).
+_FEEDBACK_MAX_ENTRIES = 3
+_FEEDBACK_MAX_CHARS = 4000
+
+# Static shell of the generate_code user prompt, formatted per call with
+# the optimized prompt and the bounded feedback tail.
+_GEN_USER_TEMPLATE = ("USER PROMPT:\n{prompt}\n\n"
+                      "PREVIOUS ATTEMPTS FEEDBACK:\n{feedback}")
+
+# Where generated scripts are staged inside the sandbox, and the stub that
+# re-runs the staged file so retries do not re-upload the full source.
+_SANDBOX_SCRIPT_PATH = "/tmp/gen.py"
+_SANDBOX_RUN_SCRIPT = (
+    f"exec(compile(open({_SANDBOX_SCRIPT_PATH!r}).read(), "
+    f"{_SANDBOX_SCRIPT_PATH!r}, 'exec'))"
+)
+
+
+# Extracted import names keyed by a hash of the imports block. Retries
+# usually regenerate the code but keep the imports, so the regex scan
+# only ever runs once per distinct block.
+_LIBS_CACHE: dict = {}
+_LIBS_CACHE_MAX = 256
+
+
+def _detect_libs(imports: str) -> list:
+    """Extract top-level import names, deduplicated in source order."""
+    key = hashlib.md5(imports.encode("utf-8")).hexdigest()
+    libs = _LIBS_CACHE.get(key)
+    if libs is None:
+        if len(_LIBS_CACHE) >= _LIBS_CACHE_MAX:
+            _LIBS_CACHE.clear()
+        libs = list(dict.fromkeys(_IMPORT_RE.findall(imports)))
+        _LIBS_CACHE[key] = libs
+    return libs
+
+
+def _backoff_delay(base: float, attempt: int, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter, so retries do not herd after an outage."""
+    return min(cap, base * 2 ** attempt) + random.random()
+
+
+def _has_third_party_libs(libs) -> bool:
+    """Whether any detected import lies outside the standard library."""
+    return any(lib not in sys.stdlib_module_names for lib in libs)
+
+
+class SandboxPool:
+    """
+    Keeps warm E2B sandboxes alive between execute_code calls and across
+    concurrent workflows, so each iteration does not pay the multi-second
+    sandbox boot again. Sandboxes are parked in an idle queue between
+    uses; each one tracks the packages already installed into it so
+    retries with unchanged imports skip pip entirely.
+    """
+
+    def __init__(self, max_idle: int = 2):
+        self._max_idle = max_idle
+        self._idle: "queue.Queue[Sandbox]" = queue.Queue()
+
+    @contextmanager
+    def acquire(self):
+        """
+        Check out a warm sandbox, creating one when the pool is empty.
+        The sandbox returns to the pool on clean exit and is killed if
+        the block raises, so a broken sandbox is never handed out again.
+        """
+        sandbox = self._checkout()
+        try:
+            yield sandbox
+        except Exception:
+            self._kill(sandbox)
+            raise
+        else:
+            self._release(sandbox)
+
+    def close(self) -> None:
+        """Kill every idle sandbox; registered to run at interpreter exit."""
+        while True:
+            try:
+                self._kill(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _checkout(self) -> Sandbox:
+        # Prefer an idle sandbox, dropping any that died while parked.
+        while True:
+            try:
+                sandbox = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                sandbox.set_timeout(MAX_CODE_TIMEOUT)
+                return sandbox
+            except Exception as e:
+                logger.warning(f"Discarding stale pooled sandbox: {e}")
+                self._kill(sandbox)
+
+        sandbox = Sandbox(
+            api_key=E2B_API_KEY,
+            timeout=MAX_CODE_TIMEOUT
+        )
+        sandbox._installed = set()
+        return sandbox
+
+    def _release(self, sandbox: Sandbox) -> None:
+        try:
+            # Extend the lifetime so the sandbox survives until reuse.
+            sandbox.set_timeout(MAX_CODE_TIMEOUT)
+        except Exception:
+            self._kill(sandbox)
+            return
+        if self._idle.qsize() < self._max_idle:
+            self._idle.put(sandbox)
+        else:
+            self._kill(sandbox)
+
+    @staticmethod
+    def _kill(sandbox: Sandbox) -> None:
+        try:
+            sandbox.kill()
+        except Exception:
+            pass
+
+
+_sandbox_pool = SandboxPool()
+atexit.register(_sandbox_pool.close)
+
+# Background worker used to hide sandbox boot and pip installs behind
+# the LLM round-trips that precede code execution. Each workflow carries
+# its own pending install in state (install_future), so concurrent graph
+# runs never consume or block on one another's prefetch.
+_install_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def _prewarm_sandbox() -> None:
+    """Boot a pooled sandbox ahead of time; failures are non-fatal here."""
+    try:
+        with _sandbox_pool.acquire():
+            pass
+    except Exception as e:
+        logger.debug(f"Sandbox prewarm failed (will retry at execution time): {e}")
+
+
+def _probe_missing(sandbox: Sandbox, libs: list) -> list:
+    """
+    Ask the sandbox which of the given import names it cannot resolve;
+    anything preinstalled in the template never needs pip. Falls back to
+    treating everything as missing if the probe itself fails.
+    """
+    probe_cmd = (
+        f"import importlib.util, json; "
+        f"print(json.dumps([n for n in {libs!r} "
+        f"if importlib.util.find_spec(n) is None]))"
+    )
+    try:
+        result = sandbox.run_code(probe_cmd, timeout=MAX_CODE_TIMEOUT)
+        if not result.error and result.logs.stdout:
+            return json.loads("".join(result.logs.stdout))
+    except Exception as e:
+        logger.debug(f"Sandbox import probe failed: {e}")
+    return list(libs)
+
+
+def _install_into(sandbox: Sandbox, libs: list) -> None:
+    """
+    Install whatever the sandbox is missing for the given import names
+    with a single batched pip call, recording successes on the sandbox
+    so retries with the same imports skip pip.
+    """
+    candidates = [lib for lib in libs
+                  if lib not in sys.stdlib_module_names
+                  and _PACKAGE_ALIASES.get(lib, lib) not in sandbox._installed]
+    if not candidates:
+        return
+
+    missing = _probe_missing(sandbox, candidates)
+    for lib in candidates:
+        if lib not in missing:
+            # Preinstalled in the template; remember so we never re-probe.
+            sandbox._installed.add(_PACKAGE_ALIASES.get(lib, lib))
+
+    to_install = [_PACKAGE_ALIASES.get(lib, lib) for lib in missing]
+    if not to_install:
+        return
+
+    try:
+        logger.info(f"Installing required libraries in sandbox: {to_install}")
+        install_cmd = (
+            f"import subprocess, sys; "
+            f"proc = subprocess.run([sys.executable, '-m', 'pip', 'install', "
+            f"'--no-input', '--disable-pip-version-check', *{to_install!r}], "
+            f"capture_output=True, text=True, check=False); "
+            f"sys.stdout.write(proc.stdout); sys.stdout.flush(); "
+            f"sys.stderr.write(proc.stderr); sys.stderr.flush(); "
+            f"exit(proc.returncode)"
+        )
+        install_result = sandbox.run_code(
+            install_cmd,
+            timeout=MAX_CODE_TIMEOUT
+        )
+
+        if install_result.error:
+            error_message = str(install_result.error)
+            logger.warning(f"Failed to install {to_install} in sandbox. Error: {error_message}")
+            _install_each(sandbox, to_install)
+        else:
+            logger.info(f"Successfully installed {to_install} in sandbox.")
+            sandbox._installed.update(to_install)
+
+    except Exception as e:
+        logger.warning(f"Exception while trying to install {to_install}: {e}")
+
+
+def _install_each(sandbox: Sandbox, packages: list) -> None:
+    """
+    Fallback for a failed batched install: retry each package separately,
+    in parallel, inside one run_code call. One broken requirement no
+    longer takes the whole batch down with it, and since pip is IO-bound
+    on the download the wall time stays close to the slowest package.
+    """
+    try:
+        logger.info(f"Retrying failed batch per package: {packages}")
+        fallback_cmd = (
+            f"import json, subprocess, sys; "
+            f"from concurrent.futures import ThreadPoolExecutor; "
+            f"inst = lambda pkg: (pkg, subprocess.run("
+            f"[sys.executable, '-m', 'pip', 'install', "
+            f"'--no-input', '--disable-pip-version-check', pkg], "
+            f"capture_output=True, text=True, check=False).returncode); "
+            f"ex = ThreadPoolExecutor(max_workers=4); "
+            f"print(json.dumps(list(ex.map(inst, {packages!r}))))"
+        )
+        result = sandbox.run_code(fallback_cmd, timeout=MAX_CODE_TIMEOUT)
+        if result.error:
+            logger.warning(f"Per-package install fallback failed: {result.error}")
+            return
+
+        statuses = json.loads("".join(result.logs.stdout))
+        installed = [pkg for pkg, code in statuses if code == 0]
+        failed = [pkg for pkg, code in statuses if code != 0]
+        sandbox._installed.update(installed)
+        if installed:
+            logger.info(f"Installed individually: {installed}")
+        if failed:
+            logger.warning(f"Could not install in sandbox: {failed}")
+
+    except Exception as e:
+        logger.warning(f"Exception during per-package install fallback: {e}")
+
+
+def _ensure_libs(libs: list) -> None:
+    """Background-install dependencies into a pooled sandbox before execution."""
+    if not libs:
+        return
+    try:
+        with _sandbox_pool.acquire() as sandbox:
+            _install_into(sandbox, libs)
+    except Exception as e:
+        logger.warning(f"Background dependency install failed: {e}")
+
 
 def optimize_prompt(state: GraphState) -> GraphState:
     """
@@ -25,6 +322,11 @@ def optimize_prompt(state: GraphState) -> GraphState:
     logger.info("NODE: optimize_prompt")
     question = state["initial_question"]
 
+    # Boot the sandbox in the background so it is warm by the time the
+    # two LLM round-trips ahead of execute_code have finished.
+    if E2B_API_KEY:
+        _install_executor.submit(_prewarm_sandbox)
+
     user_prompt = get_code_optimization_user_prompt(question)
 
     messages = [
@@ -36,11 +338,10 @@ def optimize_prompt(state: GraphState) -> GraphState:
 
     if error:
         logger.error(f"LLM call for prompt optimization failed: {error}")
-        return {**state, "error_message": error}
+        return {"error_message": error}
 
     logger.info("Prompt optimized successfully.")
     return {
-        **state,
         "optimized_prompt": instance.optimized_prompt,
         "feedback_history": [f"Reasoning for prompt optimization: {instance.reasoning}"]
     }
@@ -55,8 +356,14 @@ def generate_code(state: GraphState) -> GraphState:
 
     system_prompt = CODE_GENERATION_PROMPT
 
-    feedback_message = "\n".join(state['feedback_history'])
-    user_prompt = f"USER PROMPT:\n{state['optimized_prompt']}\n\nPREVIOUS ATTEMPTS FEEDBACK:\n{feedback_message}"
+    # Only the most recent failures steer the next attempt; replaying the
+    # full history would grow the prompt linearly with every retry.
+    feedback_message = "\n".join(
+        entry[-_FEEDBACK_MAX_CHARS:]
+        for entry in state['feedback_history'][-_FEEDBACK_MAX_ENTRIES:]
+    )
+    user_prompt = _GEN_USER_TEMPLATE.format(prompt=state['optimized_prompt'],
+                                            feedback=feedback_message)
 
     messages = [
         {"role": "system", "content": system_prompt},
@@ -67,12 +374,24 @@ def generate_code(state: GraphState) -> GraphState:
 
     if error:
         logger.error(f"Code generation by LLM failed: {error}")
-        return {**state, "error_message": error}
+        return {"error_message": error}
 
     logger.info("Code generated successfully.")
-    return {**state,
-            "generation": instance,
-            "iteration": state["iteration"] + 1}
+
+    # Kick off dependency installation while the graph transitions to
+    # execute_code, so pip runs concurrently with node bookkeeping.
+    install_future: Optional[Future] = None
+    if E2B_API_KEY:
+        libs = _detect_libs(instance.imports)
+        if _has_third_party_libs(libs):
+            install_future = _install_executor.submit(_ensure_libs, libs)
+
+    # Clear the failure that routed us here, otherwise the router ends
+    # the workflow before the regenerated code is ever re-executed.
+    return {"generation": instance,
+            "iteration": state["iteration"] + 1,
+            "error_message": None,
+            "install_future": install_future}
 
 
 def execute_code(state: GraphState) -> GraphState:
@@ -84,11 +403,11 @@ def execute_code(state: GraphState) -> GraphState:
     code_gen = state.get("generation")
     if not code_gen:
         logger.error("Code generation was skipped or failed prior to execution.")
-        return {**state,
-                "error_message": "Code generation was skipped or failed."}
+        return {"error_message": "Code generation was skipped or failed."}
 
-    imports = re.sub(r"```python\n|```", "", code_gen.imports).strip()
-    code = re.sub(r"```python\n|```", "", code_gen.code).strip()
+    # Fences are already stripped by the PythonCode field validator.
+    imports = code_gen.imports
+    code = code_gen.code
     full_code = f"{imports}\n\n{code}"
     logger.debug(f"Prepared Code for execution:\n---\n{full_code}\n---")
 
@@ -99,102 +418,93 @@ def _execute_with_e2b(state: GraphState, full_code: str, imports: str) -> GraphS
     """Execute code using E2B Sandbox with retry mechanism"""
     logger.info("Attempting E2B Sandbox for code execution...")
 
-    libs = set(re.findall(r'^\s*(?:import|from)\s+([\w\d_]+)', imports, re.MULTILINE))
+    libs = _detect_libs(imports)
     max_sandbox_retries = 3
     max_execution_retries = 5
     last_error = None
 
+    # Let this workflow's install from generate_code finish first, so its
+    # sandbox is parked back in the pool before we check one out here.
+    future = state.get("install_future")
+    if future is not None:
+        try:
+            future.result(timeout=MAX_CODE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Background dependency install failed: {e}")
+
     for attempt in range(max_sandbox_retries):
         try:
             sandbox_lifecycle_timeout = MAX_CODE_TIMEOUT
-            logger.info("Initializing E2B sandbox with template, " +
-                       f"lifecycle timeout {sandbox_lifecycle_timeout}" +
-                       f"s (attempt {attempt + 1}/{max_sandbox_retries})...")
-
-            with Sandbox(
-                api_key=E2B_API_KEY,
-                timeout=sandbox_lifecycle_timeout
-            ) as sandbox:
-                logger.info("Sandbox initialized successfully.")
-
-                if libs:
-                    logger.info(f"Installing required libraries in sandbox: {libs}")
-                    for lib in libs:
-                        pip_install_op_timeout = MAX_CODE_TIMEOUT
-                        try:
-                            logger.info(f"Installing {lib} in sandbox...")
-                            install_cmd = (
-                                f"import subprocess, sys; "
-                                f"proc = subprocess.run([sys.executable, '-m', 'pip', 'install', '{lib}'], "
-                                f"capture_output=True, text=True, check=False); "
-                                f"sys.stdout.write(proc.stdout); sys.stdout.flush(); "
-                                f"sys.stderr.write(proc.stderr); sys.stderr.flush(); "
-                                f"exit(proc.returncode)"
-                            )
-                            install_result = sandbox.run_code(
-                                install_cmd,
-                                timeout=pip_install_op_timeout
-                            )
-
-                            if install_result.error:
-                                error_message = str(install_result.error)
-                                logger.warning(f"Failed to install {lib} in sandbox. Error: {error_message}")
-                            else:
-                                logger.info(f"Successfully installed {lib} in sandbox.")
-
-                        except Exception as e:
-                            logger.warning(f"Exception while trying to install {lib}: {e}")
+            logger.info(f"Acquiring E2B sandbox with lifecycle timeout "
+                        f"{sandbox_lifecycle_timeout}s "
+                        f"(attempt {attempt + 1}/{max_sandbox_retries})...")
+
+            with _sandbox_pool.acquire() as sandbox:
+                logger.info("Sandbox ready.")
+
+                _install_into(sandbox, libs)
+
+                # Upload the script once; the retry loop then re-runs it
+                # from the sandbox filesystem instead of resending the
+                # full source in every run_code RPC payload.
+                sandbox.files.write(_SANDBOX_SCRIPT_PATH, full_code)
 
                 for exec_attempt in range(max_execution_retries):
                     try:
                         logger.info(f"Executing main code in E2B sandbox (attempt {exec_attempt + 1}/{max_execution_retries})...")
+                        # Stream output into growing buffers instead of
+                        # materializing the full log list after the run.
+                        stdout_buf = io.StringIO()
+                        stderr_buf = io.StringIO()
                         execution = sandbox.run_code(
-                            full_code,
-                            timeout=MAX_CODE_TIMEOUT
+                            _SANDBOX_RUN_SCRIPT,
+                            timeout=MAX_CODE_TIMEOUT,
+                            on_stdout=lambda msg: stdout_buf.write(msg.line),
+                            on_stderr=lambda msg: stderr_buf.write(msg.line),
                         )
 
                         if execution.error:
-                            error_output = str(execution.error)
-                            if hasattr(execution.error, 'traceback'):
-                                error_output += "\nTraceback:\n" + "\n".join(execution.error.traceback)
-                            if hasattr(execution.logs, 'stderr'):
-                                error_output += "\nStderr from execution:\n" + str(execution.logs.stderr)
+                            parts = [str(execution.error)]
+                            tb = getattr(execution.error, 'traceback', None)
+                            if tb:
+                                parts.append("Traceback:\n" + "\n".join(tb))
+                            stderr_text = stderr_buf.getvalue()
+                            if stderr_text:
+                                parts.append("Stderr from execution:\n" + stderr_text)
+                            error_output = "\n".join(parts)
 
                             last_error = error_output
                             logger.error(f"Code execution failed (attempt {exec_attempt + 1}): {error_output}")
 
                             if exec_attempt < max_execution_retries - 1:
-                                logger.info("Retrying execution in 2 seconds...")
-                                time.sleep(2)
+                                delay = _backoff_delay(2, exec_attempt)
+                                logger.info(f"Retrying execution in {delay:.1f} seconds...")
+                                time.sleep(delay)
                                 continue
 
                             feedback = f"Your code failed to execute after {max_execution_retries} attempts. Last error:\n{last_error}"
-                            return {**state,
-                                    "error_message": "Execution failed with sandbox error.",
-                                    "feedback_history": state["feedback_history"] + [feedback]}
+                            return {"error_message": "Execution failed with sandbox error.",
+                                    "feedback_history": [feedback]}
                         else:
                             logger.info("Code executed successfully in sandbox.")
-                            output_parts = []
-                            if execution.logs.stdout:
-                                output_parts.extend(execution.logs.stdout)
-
-                            final_output = "\n".join(output_parts).strip() if output_parts else "Code executed successfully (no direct stdout)"
+                            final_output = stdout_buf.getvalue().strip() or "Code executed successfully (no direct stdout)"
 
-                            if execution.logs.stderr:
-                                logger.info(f"Execution Stderr from sandbox:\n{execution.logs.stderr}")
+                            stderr_text = stderr_buf.getvalue()
+                            if stderr_text:
+                                logger.info(f"Execution Stderr from sandbox:\n{stderr_text}")
 
-                            return {**state,
-                                    "execution_result": final_output,
+                            return {"execution_result": final_output,
                                     "error_message": None}
 
                     except Exception as e:
                         last_error = str(e)
                         logger.error(f"Execution attempt {exec_attempt + 1} failed: {last_error}")
                         if exec_attempt < max_execution_retries - 1:
-                            logger.info("Retrying execution in 2 seconds...")
-                            time.sleep(2)
+                            delay = _backoff_delay(2, exec_attempt)
+                            logger.info(f"Retrying execution in {delay:.1f} seconds...")
+                            time.sleep(delay)
                             continue
-                        break
+                        raise
 
         except Exception as e:
             error_msg = str(e)
@@ -202,17 +512,70 @@ def _execute_with_e2b(state: GraphState, full_code: str, imports: str) -> GraphS
             logger.error(f"E2B operation failed (attempt {attempt + 1}/{max_sandbox_retries}): {error_msg}")
 
             if attempt < max_sandbox_retries - 1:
-                logger.warning("Sandbox error. Retrying in 5 seconds...")
-                time.sleep(5)
+                delay = _backoff_delay(5, attempt)
+                logger.warning(f"Sandbox error. Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
                 continue
 
     # If we get here, all attempts failed
     logger.critical("All E2B attempts failed")
+    if ALLOW_LOCAL_EXECUTION:
+        logger.warning("Falling back to local execution...")
+        return _execute_locally(state, full_code)
+    feedback = "All E2B execution attempts failed."
     if last_error:
-        state["feedback_history"].append(f"Last E2B error: {last_error}")
-    return {**state,
-            "error_message": "All E2B execution attempts failed.",
-            "feedback_history": state["feedback_history"] + [feedback]}
+        feedback += f" Last E2B error:\n{last_error}"
+    return {"error_message": "All E2B execution attempts failed.",
+            "feedback_history": [feedback]}
+
+
+def _tail(raw: bytes, cap: int = _LOCAL_OUTPUT_CAP) -> bytes:
+    """Return the last `cap` bytes of an output stream, marking truncation."""
+    if len(raw) <= cap:
+        return raw
+    return b"[... output truncated ...]\n" + raw[-cap:]
+
+
+def _execute_locally(state: GraphState, full_code: str) -> GraphState:
+    """
+    Execute code with the local Python interpreter. Only used as a
+    fallback when ALLOW_LOCAL_EXECUTION is enabled and E2B is unavailable.
+    """
+    logger.info("Executing code locally...")
+
+    try:
+        # Feed the source as bytes and keep the pipes binary; stdout and
+        # stderr are only decoded on the branch that actually needs them.
+        result = subprocess.run(
+            [sys.executable, "-I", "-"],
+            input=full_code.encode("utf-8"),
+            capture_output=True,
+            timeout=MAX_CODE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        logger.error(f"Local code execution timed out after {MAX_CODE_TIMEOUT} seconds.")
+        feedback = (f"Your code timed out after {MAX_CODE_TIMEOUT} seconds "
+                    f"of local execution.")
+        return {"error_message": "Local execution timed out.",
+                "feedback_history": [feedback]}
+
+    if result.returncode != 0:
+        stderr = _tail(result.stderr).decode("utf-8", errors="replace")
+        logger.error(f"Local code execution failed:\n{stderr}")
+        feedback = f"Your code failed to execute locally. Error:\n{stderr}"
+        return {"error_message": "Local execution failed.",
+                "feedback_history": [feedback]}
+
+    logger.info("Code executed successfully locally.")
+    stdout = _tail(result.stdout).decode("utf-8", errors="replace").strip()
+    final_output = stdout if stdout else "Code executed successfully (no direct stdout)"
+    return {"execution_result": final_output,
+            "error_message": None}
+
+
+def _normalize_feedback(entry: str) -> str:
+    """Collapse whitespace and line numbers so near-identical errors compare equal."""
+    return _LINE_NO_RE.sub('line N', ' '.join(entry.split()))
 
 
 def should_continue(state: GraphState) -> str:
@@ -220,15 +583,24 @@ def should_continue(state: GraphState) -> str:
     Decides the next step based on the current state. Router node.
     """
     logger.info("ROUTER: should_continue")
-    if state.get("error_message") is None:
+    error_message = state.get("error_message")
+    iteration = state["iteration"]
+
+    if error_message is None:
         logger.info("Conclusion: Success. Ending workflow.")
         return "end"
-    if state["iteration"] >= MAX_RETRY_ITERATIONS:
-        logger.info(f"Conclusion: Max retries ({MAX_RETRY_ITERATIONS})" +
-                    "reached. Ending workflow.")
+    if iteration >= MAX_RETRY_ITERATIONS:
+        logger.info(f"Conclusion: Max retries ({MAX_RETRY_ITERATIONS}) "
+                    f"reached. Ending workflow.")
+        return "end"
+
+    history = state["feedback_history"]
+    if (len(history) >= 2
+            and _normalize_feedback(history[-1]) == _normalize_feedback(history[-2])):
+        logger.info("Conclusion: Same error twice in a row. "
+                    "Further retries are unlikely to recover. Ending workflow.")
         return "end"
     else:
-        logger.info(f"Conclusion: Error detected. " +
-                    "Retrying (Attempt " +
-                    f"{state['iteration'] + 1}/{MAX_RETRY_ITERATIONS}).")
+        logger.info(f"Conclusion: Error detected. Retrying (Attempt "
+                    f"{iteration + 1}/{MAX_RETRY_ITERATIONS}).")
         return "retry"
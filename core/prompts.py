@@ -21,14 +21,25 @@ Pay close attention to any feedback from previous attempts to correct
 your mistakes."""
 
 
+# Static user-prompt templates, built once at import time; the helpers
+# below only substitute the question instead of re-concatenating the
+# constant prefix on every call.
+_OPTIMIZATION_USER_TEMPLATE = (
+    "Please refine the following user request into an "
+    "optimized prompt for a code generation AI:\n\n---\n"
+    "USER REQUEST: \"{question}\"\n---"
+)
+
+_GENERATION_USER_TEMPLATE = (
+    "Please generate a complete, standalone, and executable Python script "
+    "to solve the following user request:\n\n---\n"
+    "USER REQUEST: \"{question}\"\n---"
+)
+
+
 def get_code_optimization_user_prompt(question: str) -> str:
-    output = "Please refine the following user request into an " +\
-        "optimized prompt for a code generation AI:\n\n---\n" +\
-        f"USER REQUEST: \"{question}\"\n---"
-    return output
+    return _OPTIMIZATION_USER_TEMPLATE.format(question=question)
 
 
 def get_code_generation_user_prompt(question: str) -> str:
-    output = "Please generate a complete, standalone, and executable Python script to solve the following user request:\n\n---\n" +\
-        f"USER REQUEST: \"{question}\"\n---"
-    return output
+    return _GENERATION_USER_TEMPLATE.format(question=question)
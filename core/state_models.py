@@ -1,26 +1,54 @@
-from typing import List, TypedDict, Optional
-from pydantic import BaseModel, Field
+from __future__ import annotations
+
+import re
+from concurrent.futures import Future
+from typing import Annotated, TypedDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+_FENCE_RE = re.compile(r"```python\n|```")
+
+# Feedback entries kept in state. Old tracebacks stop steering the LLM
+# after a few iterations anyway, so anything beyond this only consumes
+# memory across long-running sessions.
+_FEEDBACK_HISTORY_MAXLEN = 10
+
+
+def keep_recent_feedback(existing: list[str], new: list[str]) -> list[str]:
+    """State reducer: append new feedback, keeping only the newest entries."""
+    return (existing + new)[-_FEEDBACK_HISTORY_MAXLEN:]
 
 
 class CodeSolution(BaseModel):
     """Schema for an optimized user prompt and the reasoning behind it."""
+    model_config = ConfigDict(frozen=True, extra='ignore', defer_build=True)
+
     optimized_prompt: str = Field(description="A detailed, optimized prompt for a code generation AI, incorporating all user requirements.")
     reasoning: str = Field(description="A clear justification for why the new prompt is better and how it will lead to a superior code solution.")
 
 
 class PythonCode(BaseModel):
     """Schema for a complete Python code solution."""
+    model_config = ConfigDict(frozen=True, extra='ignore', defer_build=True)
+
     task_description: str = Field(description="A concise description of the coding task and the proposed approach.")
     imports: str = Field(description="All necessary import statements for the code, separated by newlines.")
     code: str = Field(description="The complete, executable Python code block, without any import statements.")
 
+    @field_validator("imports", "code")
+    @classmethod
+    def _strip_fences(cls, value: str) -> str:
+        """Drop markdown code fences the model sometimes wraps around its output."""
+        return _FENCE_RE.sub("", value).strip()
+
 
 class GraphState(TypedDict):
     """Represents the state of our workflow graph."""
     initial_question: str
     optimized_prompt: str
-    generation: Optional[PythonCode]
-    execution_result: Optional[str]
-    error_message: Optional[str]
-    feedback_history: List[str]
+    generation: PythonCode | None
+    execution_result: str | None
+    error_message: str | None
+    feedback_history: Annotated[list[str], keep_recent_feedback]
     iteration: int
+    install_future: Future | None
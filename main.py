@@ -1,19 +1,24 @@
 import logging
 import sys
-from dotenv import load_dotenv
 
-load_dotenv()
+from config import LOG_LEVEL, OPENAI_API_KEY
 
-from web_ui.gradio_app import launch_app
-
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 
 def main():
     """Main entry point for the web interface."""
+    if not OPENAI_API_KEY:
+        logger.critical("OPENAI_API_KEY is not set. "
+                        "Configure it in the environment or .env file.")
+        sys.exit(1)
+
     try:
         logger.info("Launching Gradio app...")
+        # Imported here so config failures exit before paying the
+        # multi-second Gradio/FastAPI import cost.
+        from web_ui.gradio_app import launch_app
         launch_app()
     except KeyboardInterrupt:
         logger.critical("Keyboard interrupt detected. Shutting down gracefully...")
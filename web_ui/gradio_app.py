@@ -1,157 +1,239 @@
-import gradio as gr
+from __future__ import annotations
+
 import os
+
+# Gradio reads these at import time; set them first so no analytics or
+# telemetry request ever fires during startup.
+os.environ.setdefault("GRADIO_ANALYTICS_ENABLED", "False")
+os.environ.setdefault("HF_HUB_DISABLE_TELEMETRY", "1")
+
+import gradio as gr
+import re
+import html
+import json
+import atexit
+import logging
+import shutil
+import hashlib
 import tempfile
-from typing import Tuple, Optional
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator, Tuple, Optional
+
+if TYPE_CHECKING:
+    from core.code_agent import CodeAgent, ExecutionResult
+
 
-os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+logger = logging.getLogger(__name__)
 
-from core.code_agent import CodeAgent, ExecutionResult
+
+# Download files are content-addressed by a hash of the code, so
+# regenerating (or re-clicking) the same script reuses one file on disk
+# instead of leaking a new NamedTemporaryFile per request. The whole
+# directory is removed at interpreter exit.
+# Example prompts live in a static asset and are parsed once per process
+# instead of being rebuilt inside every interface construction.
+_EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "static", "examples.json")
+with open(_EXAMPLES_PATH, encoding="utf-8") as _f:
+    _EXAMPLES = json.load(_f)
+
+_DOWNLOAD_CACHE_MAX = 128
+_download_dir = os.path.join(tempfile.gettempdir(), "raca_i_downloads")
+_download_cache: "OrderedDict[str, str]" = OrderedDict()
+atexit.register(shutil.rmtree, _download_dir, ignore_errors=True)
 
 
 class CodeGeneratorUI:
     """Clean UI wrapper for the CodeAgent with proper separation of concerns."""
 
+    # HTML shells built once at class load; per-request rendering is a
+    # single %-substitution of escaped values.
+    _STATUS_TMPL = (
+        '<div class="status-card status-%s">'
+        '<h3 style="margin: 0 0 10px 0; font-size: 1.3rem; font-weight: 600;">%s</h3>'
+        '<p style="margin: 0; font-size: 1rem; opacity: 0.95;">%s</p>'
+        '</div>'
+    )
+
+    _METRICS_TMPL = (
+        '<div class="metrics-container">'
+        '<div class="metric-card">'
+        '<div class="metric-value">%.2fs</div>'
+        '<div class="metric-label">Execution Time</div>'
+        '</div>'
+        '<div class="metric-card">'
+        '<div class="metric-value">%d</div>'
+        '<div class="metric-label">Iterations</div>'
+        '</div>'
+        '<div class="metric-card">'
+        '<div class="metric-value">%s</div>'
+        '<div class="metric-label">Status</div>'
+        '</div>'
+        '</div>'
+    )
+
+    # The recurring status cards are fixed strings; render them once at
+    # class load and return them by reference instead of re-formatting.
+    _STATUS_READY = _STATUS_TMPL % (
+        "ready", "🎯 Ready", "Enter your request above to get started")
+    _STATUS_WORKING_RUN = _STATUS_TMPL % (
+        "ready", "⏳ Working", "Generating and executing your code...")
+    _STATUS_WORKING_GEN = _STATUS_TMPL % (
+        "ready", "⏳ Working", "Generating your code...")
+    _STATUS_EMPTY_REQUEST = _STATUS_TMPL % (
+        "error", "❌ Error", "Please enter a valid request")
+    _STATUS_SUCCESS_EXECUTED = _STATUS_TMPL % (
+        "success", "✅ Success", "Code generated and executed successfully!")
+    _STATUS_SUCCESS_GENERATED = _STATUS_TMPL % (
+        "success", "✅ Success", "Code generated successfully!")
+
     def __init__(self):
-        self.agent = CodeAgent(verbose=False)
+        # The agent pulls in the LangGraph/OpenAI stack; defer building
+        # it so the interface can be constructed and served immediately.
+        self._agent: "Optional[CodeAgent]" = None
+        self._agent_lock = threading.Lock()
+
+    @property
+    def agent(self) -> "CodeAgent":
+        """Build the CodeAgent on first use (double-checked lock)."""
+        if self._agent is None:
+            with self._agent_lock:
+                if self._agent is None:
+                    from core.code_agent import CodeAgent
+                    self._agent = CodeAgent(verbose=False)
+        return self._agent
 
     def generate_and_execute_code(
         self,
-        user_request: str
-    ) -> Tuple[str, str, str, str, Optional[str]]:
+        user_request: str,
+        progress_cb=None
+    ) -> Iterator[Tuple[str, str, str, str, Optional[str]]]:
         """
         Generate and execute code based on user request.
 
-        Returns:
-            Tuple of (status_html, final_answer, generated_code, execution_info, download_file)
+        Yields interim tuples so the UI updates as soon as work starts,
+        ending with the final
+        (status_html, final_answer, generated_code, execution_info, download_file).
         """
         if not user_request.strip():
-            return (
-                self._create_status_html("error", "❌ Error", "Please enter a valid request"),
-                "",
-                "",
-                "",
-                None
-            )
+            yield self._STATUS_EMPTY_REQUEST, "", "", "", None
+            return
+
+        yield self._STATUS_WORKING_RUN, "", "", "", None
 
         try:
-            result = self.agent.generate_and_execute(user_request)
+            result = self.agent.generate_and_execute(user_request,
+                                                     progress_cb=progress_cb)
 
             status_html = self._create_status_html_from_result(result)
             final_answer = result.output or "Code executed successfully (no output)" if result.success else f"**Error:** {result.error_message}"
-            generated_code = self.agent.get_full_code(result) or "No code generated"
+            generated_code = (self.agent.get_full_code(result)
+                              if result.success else "") or "No code generated"
             execution_info = self._create_execution_info(result)
             download_file = self._create_download_file(generated_code) if result.success else None
 
-            return status_html, final_answer, generated_code, execution_info, download_file
+            yield status_html, final_answer, generated_code, execution_info, download_file
 
         except Exception as e:
             error_status = self._create_status_html("error", "❌ Fatal Error", f"An unexpected error occurred: {str(e)}")
-            return error_status, f"**Fatal Error:** {str(e)}", "", "", None
+            yield error_status, f"**Fatal Error:** {str(e)}", "", "", None
 
     def generate_code_only(
         self,
         user_request: str
-    ) -> Tuple[str, str, str, Optional[str]]:
+    ) -> Iterator[Tuple[str, str, str, Optional[str]]]:
         """
         Generate code without executing it.
 
-        Returns:
-            Tuple of (status_html, generated_code, execution_info, download_file)
+        Yields interim tuples for immediate UI feedback, ending with the
+        final (status_html, generated_code, execution_info, download_file).
         """
         if not user_request.strip():
-            return (
-                self._create_status_html("error", "❌ Error", "Please enter a valid request"),
-                "",
-                "",
-                None
-            )
+            yield self._STATUS_EMPTY_REQUEST, "", "", None
+            return
+
+        yield self._STATUS_WORKING_GEN, "", "", None
 
         try:
             result = self.agent.generate_code_only(user_request)
 
             status_html = self._create_status_html_from_result(result)
-            generated_code = self.agent.get_full_code(result) or "No code generated"
+            generated_code = (self.agent.get_full_code(result)
+                              if result.success else "") or "No code generated"
             execution_info = self._create_execution_info(result)
             download_file = self._create_download_file(generated_code) if result.success else None
 
-            return status_html, generated_code, execution_info, download_file
+            yield status_html, generated_code, execution_info, download_file
 
         except Exception as e:
             error_status = self._create_status_html("error", "❌ Fatal Error", f"An unexpected error occurred: {str(e)}")
-            return error_status, "", "", None
+            yield error_status, "", "", None
 
     def _create_status_html_from_result(self, result: ExecutionResult) -> str:
         """Create status HTML from execution result."""
         if result.success:
-            return self._create_status_html(
-                "success",
-                "✅ Success",
-                "Code generated and executed successfully!" if result.output is not None else "Code generated successfully!"
-            )
-        else:
-            return self._create_status_html(
-                "error",
-                "❌ Failed",
-                result.error_message or "Unknown error occurred"
-            )
+            return (self._STATUS_SUCCESS_EXECUTED
+                    if result.output is not None
+                    else self._STATUS_SUCCESS_GENERATED)
+        return self._create_status_html(
+            "error",
+            "❌ Failed",
+            result.error_message or "Unknown error occurred"
+        )
 
     def _create_status_html(self, status_type: str, title: str, message: str) -> str:
-        """Create HTML for status display."""
-        return f"""
-        <div class="status-card status-{status_type}">
-            <h3 style="margin: 0 0 10px 0; font-size: 1.3rem; font-weight: 600;">{title}</h3>
-            <p style="margin: 0; font-size: 1rem; opacity: 0.95;">{message}</p>
-        </div>
-        """
+        """Create HTML for status display; the message is escaped since it
+        can carry error text derived from user input."""
+        return self._STATUS_TMPL % (status_type, title, html.escape(message))
 
     def _create_execution_info(self, result: ExecutionResult) -> str:
         """Create execution information HTML."""
-        return f"""
-        <div class="metrics-container">
-            <div class="metric-card">
-                <div class="metric-value">{result.execution_time:.2f}s</div>
-                <div class="metric-label">Execution Time</div>
-            </div>
-            <div class="metric-card">
-                <div class="metric-value">{result.iterations}</div>
-                <div class="metric-label">Iterations</div>
-            </div>
-            <div class="metric-card">
-                <div class="metric-value">{"✅" if result.success else "❌"}</div>
-                <div class="metric-label">Status</div>
-            </div>
-        </div>
-        """
+        return self._METRICS_TMPL % (result.execution_time,
+                                     result.iterations,
+                                     "✅" if result.success else "❌")
 
     def _create_download_file(self, code_content: str) -> Optional[str]:
-        """Create a temporary file for download."""
+        """Return a cached download path for the code, writing it once."""
         if not code_content or not code_content.strip():
             return None
 
         try:
-            temp_file = tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.py',
-                prefix='generated_code_',
-                delete=False,
-                encoding='utf-8'
-            )
+            digest = hashlib.sha1(code_content.encode("utf-8")).hexdigest()
+            cached_path = _download_cache.get(digest)
+            if cached_path is not None and os.path.exists(cached_path):
+                _download_cache.move_to_end(digest)
+                return cached_path
+
+            os.makedirs(_download_dir, exist_ok=True)
+            file_path = os.path.join(_download_dir,
+                                     f"generated_code_{digest[:12]}.py")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(code_content)
+
+            _download_cache[digest] = file_path
+            while len(_download_cache) > _DOWNLOAD_CACHE_MAX:
+                _, stale_path = _download_cache.popitem(last=False)
+                try:
+                    os.unlink(stale_path)
+                except OSError:
+                    pass
+
+            return file_path
+
+        except Exception:
+            logger.exception("Error creating download file")
+            return None
 
-            temp_file.write(code_content)
-            temp_file.close()
 
-            return temp_file.name
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace; the browser never needs them."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return re.sub(r"\s+", " ", css).strip()
 
-        except Exception as e:
-            print(f"Error creating download file: {e}")
-            return None
 
-
-def load_custom_css() -> str:
-    """Load custom CSS styles."""
-    return """
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;500;700&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Roboto+Mono:wght@400;500;600&display=swap');
+_RAW_CSS = """
+    /* Roboto is loaded by the theme (gr.themes.GoogleFont with display=swap);
+       a CSS @import here would re-fetch it and block first paint. */
 
     * {
         font-family: 'Roboto', sans-serif !important;
@@ -589,6 +671,15 @@ def load_custom_css() -> str:
     }
     """
 
+# Minified once at import; every interface build and page load ships the
+# compact form instead of re-allocating the ~8 KB literal per call.
+_CUSTOM_CSS = _minify_css(_RAW_CSS)
+
+
+def load_custom_css() -> str:
+    """Return the custom CSS styles."""
+    return _CUSTOM_CSS
+
 
 def create_gradio_interface():
     """Create and configure the Gradio interface."""
@@ -602,7 +693,8 @@ def create_gradio_interface():
             primary_hue="blue",
             secondary_hue="purple",
             neutral_hue="gray",
-            font=[gr.themes.GoogleFont("Roboto"), "Arial", "sans-serif"]
+            font=[gr.themes.GoogleFont("Roboto"), "Arial", "sans-serif"],
+            font_mono=[gr.themes.GoogleFont("Roboto Mono"), "Consolas", "monospace"]
         )
     ) as interface:
 
@@ -615,7 +707,7 @@ def create_gradio_interface():
         """)
 
         # Input Section
-        with gr.Group(elem_classes=["input-container"]):
+        with gr.Group(elem_classes=["input-container"]) as input_container:
             user_request = gr.Textbox(
                 label="📝 Describe what you want to code",
                 placeholder="e.g., Create a function to calculate the 100th prime number",
@@ -623,28 +715,6 @@ def create_gradio_interface():
                 elem_classes=["input-field"]
             )
 
-            # Examples right below the input
-            gr.Examples(
-                examples=[
-                    ["Calculate the 101st Fibonacci number"],
-                    ["Calculate the 97th prime number"],
-                    ["Return a plain text table with the historical prices " +
-                     "of the BTC-USD ticker for the last 20 days from " +
-                     "Yahoo Finance"],
-                    ["Create a password generator with customizable length " +
-                     "and character sets"],
-                    ["Use the Open-Meteo API to return current " + 
-                     "weather conditions in the format of a plain text " +
-                     "table for the following cities: Vancouver (BC), " + 
-                     "Kyiv (UA), Bogota (CO), Washington (D.C.), " +
-                     "and San Francisco (CA)."],
-                    ["Convert 20 Fahrenheit to Celsius"],
-                    ["Count number of characters 'r' in the word 'raspberry'"]
-                ],
-                inputs=[user_request],
-                label="💡 Click any example to try it out"
-            )
-
             with gr.Row():
                 generate_and_run_btn = gr.Button(
                     "🚀 Generate & Execute Code",
@@ -659,9 +729,7 @@ def create_gradio_interface():
                     scale=1
                 )
 
-        status_display = gr.HTML(
-            value='<div class="status-card status-ready"><h3 style="margin: 0 0 10px 0; font-size: 1.3rem; font-weight: 600;">🎯 Ready</h3><p style="margin: 0; font-size: 1rem; opacity: 0.95;">Enter your request above to get started</p></div>'
-        )
+        status_display = gr.HTML(value=CodeGeneratorUI._STATUS_READY)
 
         with gr.Tabs(elem_classes=["tab-nav"]) as tabs:
 
@@ -693,14 +761,14 @@ def create_gradio_interface():
                             elem_classes=["download-btn"]
                         )
 
-        def handle_generate_and_execute(request):
-            status, answer, code, info, file_path = ui.generate_and_execute_code(request)
-            return status, answer, code, info, gr.DownloadButton(
-                label="💾 Download Code",
-                value=file_path,
-                visible=bool(file_path),
-                elem_classes=["download-btn"]
-            )
+        def handle_generate_and_execute(request, progress=gr.Progress()):
+            # Surface per-node graph activity so retries read as progress
+            # rather than a hung request.
+            progress_cb = lambda frac, desc: progress(frac, desc=desc)
+            for status, answer, code, info, file_path in ui.generate_and_execute_code(
+                    request, progress_cb=progress_cb):
+                yield status, answer, code, info, gr.update(
+                    value=file_path, visible=bool(file_path))
 
         generate_and_run_btn.click(
             fn=handle_generate_and_execute,
@@ -710,17 +778,13 @@ def create_gradio_interface():
                      generated_code,
                      execution_info,
                      download_btn],
-            show_progress=True
+            show_progress="minimal"
         )
 
         def handle_generate_only(request):
-            status, code, info, file_path = ui.generate_code_only(request)
-            return status, "", code, info, gr.DownloadButton(
-                label="💾 Download Code",
-                value=file_path,
-                visible=bool(file_path),
-                elem_classes=["download-btn"]
-            )
+            for status, code, info, file_path in ui.generate_code_only(request):
+                yield status, "", code, info, gr.update(
+                    value=file_path, visible=bool(file_path))
 
         generate_only_btn.click(
             fn=handle_generate_only,
@@ -730,9 +794,29 @@ def create_gradio_interface():
                      generated_code,
                      execution_info,
                      download_btn],
-            show_progress=True
+            show_progress="minimal"
         )
 
+        # Examples are wired to the full handler with lazy caching: the
+        # first click on an example runs the agent once, later clicks
+        # replay the stored outputs instantly. Created down here (and
+        # re-entering the input container) because caching needs the
+        # output components and handler to exist.
+        with input_container:
+            gr.Examples(
+                examples=_EXAMPLES,
+                inputs=[user_request],
+                outputs=[status_display,
+                         final_answer,
+                         generated_code,
+                         execution_info,
+                         download_btn],
+                fn=handle_generate_and_execute,
+                cache_examples=True,
+                cache_mode="lazy",
+                label="💡 Click any example to try it out"
+            )
+
         gr.HTML("""
         <div class="footer-container">
             <p>🔒 Generated code is executed securely in the E2B isolated environment</p>
@@ -751,12 +835,32 @@ def launch_app(
 ):
     """Launch the Gradio application."""
 
-    gr.analytics_enabled = False
+    # Use uvloop's faster event loop for the embedded server when it is
+    # available; the stdlib loop is a perfectly fine fallback.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    # Warm the agent stack (LangGraph compile, OpenAI client) off the
+    # startup path so the first real request finds everything built.
+    def _prewarm_agent():
+        try:
+            from core.code_agent import CodeAgent
+            CodeAgent(verbose=False)
+        except Exception:
+            pass
+
+    threading.Thread(target=_prewarm_agent, daemon=True).start()
 
     interface = create_gradio_interface()
 
-    print("🚀 Starting AI Code Generator...")
-    print(f"📍 Server will be available at: http://{server_name}:{server_port}")
+    # Let several users' generations run concurrently (they are IO-bound
+    # on the LLM and sandbox) while bounding how many requests may wait.
+    interface.queue(default_concurrency_limit=8, max_size=128)
+
+    logger.info(f"Starting AI Code Generator at http://{server_name}:{server_port}")
 
     interface.launch(
         server_name=server_name,